@@ -2,6 +2,7 @@ import chess
 import re
 import pandas as pd
 from typing import List, Dict, Any
+from profiler import perf, get_logger
 
 MODEL_DIR = {
     "Deepseek-Alpha": './Deepseek-Alpha/',
@@ -15,6 +16,30 @@ OUTPUT_CSV = 'results_{model_name}.csv'
 PUZZLE_CSV = "puzzles_PGN.csv"
 PROMPT_DIR = ['../Prompt_A/puzzle_test/', '../Prompt_B/puzzle_test/']
 
+logger = get_logger('CS_sensor')
+
+# Parsed boards keyed by FEN, shared by every model and prompt
+_BOARD_CACHE: Dict[str, chess.Board] = {}
+
+def board_from_fen(fen: str) -> chess.Board:
+    """
+    Build a board from FEN, reusing a cached parse of the same position
+
+    Args:
+        fen: The initial state of the board
+    Returns:
+        chess.Board: Fresh copy that callers may push moves onto
+    """
+    board = _BOARD_CACHE.get(fen)
+    if board is None:
+        board = chess.Board(fen)
+        _BOARD_CACHE[fen] = board
+        perf.count('boards_built')
+    else:
+        perf.count('board_cache_hits')
+    return board.copy(stack=False)
+
+@perf.stage('parse_san')
 def parse_pgn_to_san_list(raw_pgn: str) -> List[str]:
     """
     Parse PGN into list of moves
@@ -33,6 +58,7 @@ def parse_pgn_to_san_list(raw_pgn: str) -> List[str]:
     
     # Separate tokens with a space
     moves = [token.strip() for token in pgn_text.split() if token.strip()]
+    perf.count('san_tokens_parsed', len(moves))
 
     return moves
 
@@ -56,12 +82,12 @@ def analyze_constraint_sacrifice(raw_pgn: str, initial_fen: str, mate_in_n: int,
         "PMV": 0
     }
     try:
-        board = chess.Board(initial_fen)
+        board = board_from_fen(initial_fen)
         initial_turn = board.turn
         moves_san = parse_pgn_to_san_list(raw_pgn) 
         
     except Exception as e:
-        print(f"Error parsing PGN or FEN: {e}")
+        logger.warning("Error parsing PGN or FEN: %s", e)
         return results
 
     # --- CAV ---
@@ -79,18 +105,21 @@ def analyze_constraint_sacrifice(raw_pgn: str, initial_fen: str, mate_in_n: int,
                 results['NCV'] = 1
 
     # --- PMV ---
-    for i, san_move in enumerate(moves_san):
-        try: 
-            move = board.parse_san(san_move)
-        except Exception:
-            results["PMV"] = 1
-            return results 
+    with perf.stage('board_replay'):
+        for i, san_move in enumerate(moves_san):
+            try: 
+                move = board.parse_san(san_move)
+            except Exception:
+                results["PMV"] = 1
+                return results 
+            
+            # Apply the move if the move is legal
+            board.push_san(san_move)
+            perf.count('moves_replayed')
         
-        # Apply the move if the move is legal
-        board.push_san(san_move)
-    
-    # Check if checkmated
-    if board.is_checkmate():
+        # Check if checkmated
+        is_checkmate = board.is_checkmate()
+    if is_checkmate:
         # If the initial player got mated, then CAV
         if board.turn != initial_turn:
             results["CAV"] = 0
@@ -103,44 +132,49 @@ def analyze_constraint_sacrifice(raw_pgn: str, initial_fen: str, mate_in_n: int,
 
 if __name__ == '__main__':
     # Run analysis function iterating through all data
-    for prompt in PROMPT_DIR:
-        for model_name in MODEL_DIR.keys():
-            df = pd.read_csv(prompt + MODEL_DIR[model_name] + INPUT_CSV)
-            sol_df = pd.read_csv(PUZZLE_CSV)
-            print(f"Reading {model_name}'s {INPUT_CSV} and analysis Constraint Sacrifice.")
-
-            analysis_results: List[Dict[str, Any]] = []
-            for index, row in df.iterrows():
-                mate_in_n = row['N']
-                initial_fen = row['fen']
-                raw_pgn = row['llm_output']
-                correct_pgn = row['correct_pgn']
+    with perf.session():
+        for prompt in PROMPT_DIR:
+            for model_name in MODEL_DIR.keys():
+                with perf.stage('read_csv'):
+                    df = pd.read_csv(prompt + MODEL_DIR[model_name] + INPUT_CSV)
+                    sol_df = pd.read_csv(PUZZLE_CSV)
+                logger.info("Reading %s's %s and analysis Constraint Sacrifice.", model_name, INPUT_CSV)
+
+                analysis_results: List[Dict[str, Any]] = []
+                for index, row in df.iterrows():
+                    mate_in_n = row['N']
+                    initial_fen = row['fen']
+                    raw_pgn = row['llm_output']
+                    correct_pgn = row['correct_pgn']
                 
-                # If LLM error, return error
-                if raw_pgn.strip() == 'ERROR':
-                        results = {
-                            "is_solved": 0,
-                            "error": 1,
-                            "CAV": 0,
-                            "NCV": 0,
-                            "PMV": 0
-                        }
-                else:
-                    results = analyze_constraint_sacrifice(
-                        raw_pgn=raw_pgn,
-                        initial_fen=initial_fen,
-                        mate_in_n=mate_in_n,
-                        correct_pgn=correct_pgn
-                    )
+                    # If LLM error, return error
+                    if raw_pgn.strip() == 'ERROR':
+                            results = {
+                                "is_solved": 0,
+                                "error": 1,
+                                "CAV": 0,
+                                "NCV": 0,
+                                "PMV": 0
+                            }
+                    else:
+                        results = analyze_constraint_sacrifice(
+                            raw_pgn=raw_pgn,
+                            initial_fen=initial_fen,
+                            mate_in_n=mate_in_n,
+                            correct_pgn=correct_pgn
+                        )
                 
-                # Combine with original data
-                results['N'] = mate_in_n
-                analysis_results.append(results)
+                    # Combine with original data
+                    results['N'] = mate_in_n
+                    analysis_results.append(results)
+                    perf.count('rows_analyzed')
+                    logger.debug('Row %d: %s', index, results)
 
-            # Save results into CSV form
-            results_df = pd.DataFrame(analysis_results)
-            results_df.to_csv(prompt + OUTPUT_CSV.format(model_name=model_name), index=False)
+                # Save results into CSV form
+                with perf.stage('write_csv'):
+                    results_df = pd.DataFrame(analysis_results)
+                    results_df.to_csv(prompt + OUTPUT_CSV.format(model_name=model_name), index=False)
         
-            print(f"Saved: {OUTPUT_CSV.format(model_name=model_name)}.")
+                logger.info("Saved: %s.", OUTPUT_CSV.format(model_name=model_name))
 
-    print(f"Analysis complete.")
\ No newline at end of file
+        logger.info("Analysis complete.")
\ No newline at end of file
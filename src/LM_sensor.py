@@ -2,6 +2,7 @@ import chess
 import re
 import pandas as pd
 from typing import List, Dict, Any
+from profiler import perf, get_logger
 
 MODEL_DIR = {
     "Deepseek-Alpha": './Deepseek-Alpha/',
@@ -15,6 +16,31 @@ OUTPUT_CSV = 'results_{model_name}.csv'
 PUZZLE_CSV = "puzzles_PGN.csv"
 PROMPT_DIR = ['../Prompt_A/legal_moves/', '../Prompt_B/legal_moves/']
 
+logger = get_logger('LM_sensor')
+
+# Parsed boards keyed by FEN, shared by every model and prompt
+_BOARD_CACHE: Dict[str, chess.Board] = {}
+
+def board_from_fen(fen: str, copy: bool = True) -> chess.Board:
+    """
+    Build a board from FEN, reusing a cached parse of the same position
+
+    Args:
+        fen: The initial state of the board
+        copy: Return a copy; pass False only if the board is never mutated
+    Returns:
+        chess.Board: Board that callers may push moves onto if copied
+    """
+    board = _BOARD_CACHE.get(fen)
+    if board is None:
+        board = chess.Board(fen)
+        _BOARD_CACHE[fen] = board
+        perf.count('boards_built')
+    else:
+        perf.count('board_cache_hits')
+    return board.copy(stack=False) if copy else board
+
+@perf.stage('parse_san')
 def parse_pgn_to_san_list(raw_pgn: str) -> List[str]:
     """
     Parse PGN into list of moves
@@ -33,6 +59,7 @@ def parse_pgn_to_san_list(raw_pgn: str) -> List[str]:
     
     # Separate tokens with a space
     moves = [token.strip() for token in pgn_text.split() if token.strip()]
+    perf.count('san_tokens_parsed', len(moves))
 
     return moves
 
@@ -52,49 +79,56 @@ def analyze_constraint_sacrifice(raw_pgn: str, initial_fen: str) -> dict:
         'legal': 1
     }
 
-    board = chess.Board(initial_fen)
+    # parse_san does not mutate the board, so the cached board is used as is
+    board = board_from_fen(initial_fen, copy=False)
 
     # Check if move is valid
     moves_san = parse_pgn_to_san_list(raw_pgn) 
-    try: 
-        move = board.parse_san(moves_san[0])
-        return results
-    except Exception:
-        results["legal"] = 0
-        return results 
+    with perf.stage('legal_check'):
+        try: 
+            move = board.parse_san(moves_san[0])
+            return results
+        except Exception:
+            results["legal"] = 0
+            return results 
 
 
 if __name__ == '__main__':
     # Run analysis function iterating through all data
-    for prompt in PROMPT_DIR:
-        for model_name in MODEL_DIR.keys():
-            df = pd.read_csv(prompt + MODEL_DIR[model_name] + INPUT_CSV)
-            sol_df = pd.read_csv(PUZZLE_CSV)
-            print(f"Reading {INPUT_CSV} and analysis Legal Move Count.")
-
-            analysis_results: List[Dict[str, Any]] = []
-            for index, row in df.iterrows():
+    with perf.session():
+        for prompt in PROMPT_DIR:
+            for model_name in MODEL_DIR.keys():
+                with perf.stage('read_csv'):
+                    df = pd.read_csv(prompt + MODEL_DIR[model_name] + INPUT_CSV)
+                    sol_df = pd.read_csv(PUZZLE_CSV)
+                logger.info("Reading %s and analysis Legal Move Count.", INPUT_CSV)
+
+                analysis_results: List[Dict[str, Any]] = []
+                for index, row in df.iterrows():
                 
-                initial_fen = row['fen']
-                raw_pgn = row['llm_output']
+                    initial_fen = row['fen']
+                    raw_pgn = row['llm_output']
                 
-                # If LLM error, return error
-                if raw_pgn.strip() == 'ERROR':
-                            results = {
-                                'error': 1,
-                                'legal': 0
-                            }
-                else:
-                    results = analyze_constraint_sacrifice(
-                        raw_pgn=raw_pgn,
-                        initial_fen=initial_fen,
-                    )
-                analysis_results.append(results)
-
-            # Save results into CSV form
-            results_df = pd.DataFrame(analysis_results)
-            results_df.to_csv(prompt + OUTPUT_CSV.format(model_name=model_name), index=False)
+                    # If LLM error, return error
+                    if raw_pgn.strip() == 'ERROR':
+                                results = {
+                                    'error': 1,
+                                    'legal': 0
+                                }
+                    else:
+                        results = analyze_constraint_sacrifice(
+                            raw_pgn=raw_pgn,
+                            initial_fen=initial_fen,
+                        )
+                    analysis_results.append(results)
+                    perf.count('rows_analyzed')
+                    logger.debug('Row %d: %s', index, results)
+
+                # Save results into CSV form
+                with perf.stage('write_csv'):
+                    results_df = pd.DataFrame(analysis_results)
+                    results_df.to_csv(prompt + OUTPUT_CSV.format(model_name=model_name), index=False)
         
-            print(f"Saved:{OUTPUT_CSV.format(model_name=model_name)}.")
+                logger.info("Saved:%s.", OUTPUT_CSV.format(model_name=model_name))
 
-    print(f"Analysis complete.")
\ No newline at end of file
+        logger.info("Analysis complete.")
\ No newline at end of file
@@ -1,6 +1,7 @@
 import re
 import os
 import pandas as pd
+from profiler import perf, get_logger
 
 MODEL_DIR = {
     "Deepseek-Alpha": './Deepseek-Alpha/',
@@ -12,10 +13,14 @@ MODEL_DIR = {
 PUZZLE_CSV = "puzzles_PGN.csv"
 OUTPUT_CSV = 'parsed_output.csv'
 PROMPT_DIR = ['../Prompt_A/legal_moves/', '../Prompt_B/legal_moves/']
+
+logger = get_logger('pgn_parser_LM')
+
 def main():
-    print(f"--- LLM response Parser ---")
+    logger.info("--- LLM response Parser ---")
     # Load puzzle datasets
-    puzzles = pd.read_csv(PUZZLE_CSV)
+    with perf.stage('read_csv'):
+        puzzles = pd.read_csv(PUZZLE_CSV)
 
     # Iterate through all puzzles & models
     for prompt_dir in PROMPT_DIR:
@@ -23,38 +28,56 @@ def main():
             raw_data_files = os.listdir(prompt_dir + MODEL_DIR[model_name])
             result = {'fen':[], 'llm_output':[]}
 
-            print(f'Model: {model_name}')
+            logger.info('Model: %s', model_name)
             for index, row in puzzles.iterrows():
                 fen = row['FEN']
 
-                with open(prompt_dir + MODEL_DIR[model_name] + raw_data_files[index], "r", encoding="utf-8") as raw_text_wrapper:
-                    raw_text = raw_text_wrapper.read()
+                with perf.stage('read_file'):
+                    with open(prompt_dir + MODEL_DIR[model_name] + raw_data_files[index], "r", encoding="utf-8") as raw_text_wrapper:
+                        raw_text = raw_text_wrapper.read()
+                perf.count('files_read')
+                perf.count('chars_read', len(raw_text))
+
+                extract_error = None
+                with perf.stage('extract_pgn'):
                     llm_pgn = re.search(r'\[FINAL PGN\](.*)', raw_text, re.DOTALL)
                     if llm_pgn == None:
                         llm_pgn = re.search(r'--- FINAL PGN ---(.*)', raw_text, re.DOTALL)
                         if llm_pgn == None:
                             llm_pgn = 'ERROR'
-                            print(f'{raw_data_files[index]}: {llm_pgn}')
+                            extract_error = 'no_marker'
                         else:
                             llm_pgn = llm_pgn.group(1).strip().replace('--- FINAL PGN ---', '').strip()
                             llm_pgn = llm_pgn.replace('\r\n', ' ').replace('\r', ' ').replace('\n', ' ')
-                            print(f'{raw_data_files[index]}: {llm_pgn}')
                     else: 
                         llm_pgn = llm_pgn.group(1).strip().replace('[FINAL PGN]', '').strip()
                         llm_pgn = llm_pgn.replace('\r\n', ' ').replace('\r', ' ').replace('\n', ' ')
-                        print(f'{raw_data_files[index]}: {llm_pgn}')
 
                     if llm_pgn.strip() == '':
                         llm_pgn = 'ERROR'
-                    result['fen'].append(fen)
-                    result['llm_output'].append(llm_pgn)
-            df = pd.DataFrame(result)   
-            df.to_csv(prompt_dir + MODEL_DIR[model_name] + OUTPUT_CSV, index=False)
+                        extract_error = 'empty'
+                if extract_error == 'no_marker':
+                    perf.count('extract_errors')
+                    perf.count('extract_errors_no_marker')
+                    logger.warning('%s: no FINAL PGN found', raw_data_files[index])
+                elif extract_error == 'empty':
+                    perf.count('extract_errors')
+                    perf.count('extract_errors_empty')
+                    logger.warning('%s: FINAL PGN section is empty', raw_data_files[index])
+                else:
+                    logger.debug('%s: %s', raw_data_files[index], llm_pgn)
+
+                result['fen'].append(fen)
+                result['llm_output'].append(llm_pgn)
+            with perf.stage('write_csv'):
+                df = pd.DataFrame(result)   
+                df.to_csv(prompt_dir + MODEL_DIR[model_name] + OUTPUT_CSV, index=False)
             
-            print(f'File saved: {OUTPUT_CSV}')
+            logger.info('File saved: %s', OUTPUT_CSV)
 
 
-    print("Process complete.")
+    logger.info("Process complete.")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    with perf.session():
+        main()
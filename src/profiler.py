@@ -0,0 +1,264 @@
+import cProfile
+import json
+import logging
+import os
+import pstats
+import random
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from typing import Dict, Any, Optional
+
+# --- ENVIRONMENT SETUP ---
+# Every switch is read from the environment so run.bat keeps working unchanged.
+LOG_LEVEL = os.environ.get('CSAC_LOG_LEVEL', 'INFO').upper()
+PROFILE_MODE = os.environ.get('CSAC_PROFILE', '').lower()    # '', 'cprofile' or 'sample'
+REPORT_DIR = os.environ.get('CSAC_REPORT_DIR', './')
+REPORT_JSON = 'perf_{script}.json'
+PROFILE_DUMP = 'perf_{script}.prof'
+LOG_FORMAT = '%(asctime)s %(levelname)s %(name)s: %(message)s'
+RATE_LIMIT = os.environ.get('CSAC_LOG_RATE', '20')  # Max records of one message template per window, 0 for no limit
+RATE_WINDOW = 1.0       # Seconds
+SAMPLE_INTERVAL = 0.005 # Seconds between samples of the sampling profiler
+TOP_FUNCTIONS = 20
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Drop repeated log records of the same message template
+
+    Records at ERROR or above always pass. Everything else is limited to
+    `limit` records per `window` seconds for each (logger, level, template)
+    key. A `limit` of 0 disables the filter.
+    """
+    def __init__(self, limit: int = 20, window: float = RATE_WINDOW):
+        super().__init__()
+        self.limit = limit
+        self.window = window
+        self.window_start: Dict[tuple, float] = {}
+        self.emitted: Counter = Counter()
+        self.suppressed: Counter = Counter()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.ERROR or self.limit <= 0:
+            return True
+
+        key = (record.name, record.levelname, record.msg)
+        now = time.monotonic()
+        if now - self.window_start.get(key, 0.0) >= self.window:
+            self.window_start[key] = now
+            self.emitted[key] = 0
+
+        if self.emitted[key] >= self.limit:
+            self.suppressed[key] += 1
+            return False
+        self.emitted[key] += 1
+        return True
+
+
+_rate_filter = RateLimitFilter()
+
+
+def get_logger(name: str) -> logging.Logger:
+    """
+    Return a logger sharing one rate-limited handler
+
+    Args:
+        name: Logger name, usually the script name
+    Returns:
+        logging.Logger: Configured logger
+    """
+    root = logging.getLogger('csac')
+    if not root.handlers:
+        handler = logging.StreamHandler(sys.stdout)
+        handler.setFormatter(logging.Formatter(LOG_FORMAT))
+        handler.addFilter(_rate_filter)
+        root.addHandler(handler)
+        root.propagate = False
+        if isinstance(logging.getLevelName(LOG_LEVEL), int):
+            root.setLevel(LOG_LEVEL)
+        else:
+            root.setLevel(logging.INFO)
+            root.warning('Unknown CSAC_LOG_LEVEL value %r, using INFO.', LOG_LEVEL)
+        try:
+            _rate_filter.limit = max(int(RATE_LIMIT), 0)
+        except ValueError:
+            root.warning('Unknown CSAC_LOG_RATE value %r, using %d.', RATE_LIMIT, _rate_filter.limit)
+    return root.getChild(name)
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f'{os.path.basename(code.co_filename)}:{code.co_name}:{frame.f_lineno}'
+
+
+def _is_repo_frame(frame) -> bool:
+    filename = os.path.abspath(frame.f_code.co_filename)
+    return os.path.dirname(filename) == SRC_DIR and filename != os.path.abspath(__file__)
+
+
+class StackSampler(threading.Thread):
+    """
+    Wall-clock sampling profiler of the main thread
+
+    Each sample is attributed to the innermost frame of a script in SRC_DIR,
+    so time spent inside chess or pandas points back to the calling line.
+    The innermost frame itself is kept alongside it as `repo > leaf`.
+
+    The sampler thread only wakes when it gets the GIL, so CPU-bound code is
+    sampled less often than I/O. Each sample is therefore weighted by the
+    measured gap since the previous one, and totals are in seconds. While
+    sampling, the interpreter switch interval is lowered and the wait is
+    jittered, so samples do not lock onto the points where I/O releases
+    the GIL.
+    """
+    def __init__(self, interval: float = SAMPLE_INTERVAL):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.target_id = threading.main_thread().ident
+        self.samples: Counter = Counter()
+        self.leaf_samples: Counter = Counter()
+        self.count = 0
+        self.stopped = threading.Event()
+        self.switch_interval = sys.getswitchinterval()
+
+    def run(self):
+        sys.setswitchinterval(min(self.switch_interval, self.interval / 5))
+        previous = time.perf_counter()
+        while not self.stopped.wait(self.interval * random.uniform(0.5, 1.5)):
+            frame = sys._current_frames().get(self.target_id)
+            now = time.perf_counter()
+            gap, previous = now - previous, now
+            if frame is None:
+                continue
+            leaf = _frame_label(frame)
+            repo_frame = frame
+            while repo_frame is not None and not _is_repo_frame(repo_frame):
+                repo_frame = repo_frame.f_back
+            repo = _frame_label(repo_frame) if repo_frame is not None else '<outside src>'
+            self.samples[repo] += gap
+            self.leaf_samples[f'{repo} > {leaf}'] += gap
+            self.count += 1
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+        sys.setswitchinterval(self.switch_interval)
+
+
+class PerfRecorder:
+    """
+    Collect per-stage timers and counters for one script run
+    """
+    def __init__(self, script: Optional[str] = None):
+        self.script = script or os.path.splitext(os.path.basename(sys.argv[0]))[0] or 'interactive'
+        self.timers: Dict[str, Dict[str, float]] = defaultdict(lambda: {'calls': 0, 'total_s': 0.0, 'max_s': 0.0})
+        self.counters: Counter = Counter()
+        self.started = time.perf_counter()
+        self.profile: Optional[cProfile.Profile] = None
+        self.sampler: Optional[StackSampler] = None
+
+    @contextmanager
+    def stage(self, name: str):
+        """
+        Time a block (or a function, when used as a decorator) under `name`
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            timer = self.timers[name]
+            timer['calls'] += 1
+            timer['total_s'] += elapsed
+            if elapsed > timer['max_s']:
+                timer['max_s'] = elapsed
+
+    def count(self, name: str, n: int = 1):
+        self.counters[name] += n
+
+    @contextmanager
+    def session(self, mode: str = PROFILE_MODE):
+        """
+        Wrap a whole run: start the optional profiler, then write the report
+
+        Args:
+            mode: '' for timers only, 'cprofile' or 'sample'
+        """
+        logger = get_logger(self.script)
+        self.started = time.perf_counter()
+        if mode == 'cprofile':
+            self.profile = cProfile.Profile()
+            self.profile.enable()
+        elif mode == 'sample':
+            self.sampler = StackSampler()
+            self.sampler.start()
+        elif mode:
+            logger.warning('Unknown CSAC_PROFILE value %r, profiler disabled.', mode)
+
+        try:
+            yield self
+        finally:
+            if self.profile is not None:
+                self.profile.disable()
+            if self.sampler is not None:
+                self.sampler.stop()
+            path = self.write_report()
+            logger.info('Performance report saved: %s', path)
+
+    def report(self) -> Dict[str, Any]:
+        """
+        Build the machine-readable performance report
+
+        Returns:
+            dict: Timers, counters, suppressed log counts and profiler output
+        """
+        result: Dict[str, Any] = {
+            'script': self.script,
+            'wall_s': time.perf_counter() - self.started,
+            'stages': {name: dict(timer) for name, timer in self.timers.items()},
+            'counters': dict(self.counters),
+            'suppressed_logs': {f'{name} {level}: {msg}': n for (name, level, msg), n in _rate_filter.suppressed.items()},
+        }
+        if self.profile is not None:
+            stats = pstats.Stats(self.profile).stats
+            top = sorted(stats.items(), key=lambda item: item[1][3], reverse=True)[:TOP_FUNCTIONS]
+            result['cprofile'] = [
+                {'function': f'{os.path.basename(file)}:{func}:{line}', 'calls': nc, 'tottime_s': tt, 'cumtime_s': ct}
+                for (file, line, func), (cc, nc, tt, ct, callers) in top
+            ]
+        if self.sampler is not None:
+            result['samples'] = {
+                'kind': 'wall-clock, GIL-bound; each sample weighted by the gap since the previous one',
+                'switch_interval_s': min(self.sampler.switch_interval, self.sampler.interval / 5),
+                'interval_s': self.sampler.interval,
+                'count': self.sampler.count,
+                'total_s': sum(self.sampler.samples.values()),
+                'top_s': dict(self.sampler.samples.most_common(TOP_FUNCTIONS)),
+                'top_leaf_s': dict(self.sampler.leaf_samples.most_common(TOP_FUNCTIONS)),
+            }
+        return result
+
+    def write_report(self, report_dir: str = REPORT_DIR) -> str:
+        """
+        Save the report as JSON (and the raw cProfile dump, if enabled)
+
+        Args:
+            report_dir: Folder for the report files
+        Returns:
+            str: Path of the JSON report
+        """
+        os.makedirs(report_dir, exist_ok=True)
+        if self.profile is not None:
+            self.profile.dump_stats(os.path.join(report_dir, PROFILE_DUMP.format(script=self.script)))
+        path = os.path.join(report_dir, REPORT_JSON.format(script=self.script))
+        with open(path, 'w', encoding='utf-8') as report_file:
+            json.dump(self.report(), report_file, indent=2)
+        return path
+
+
+# Shared recorder of the running script
+perf = PerfRecorder()
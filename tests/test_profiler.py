@@ -0,0 +1,115 @@
+import json
+import logging
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import profiler
+from profiler import PerfRecorder, RateLimitFilter
+
+
+def make_record(level: int, msg: str = '%s: %s', name: str = 'csac.test') -> logging.LogRecord:
+    return logging.LogRecord(name, level, __file__, 0, msg, ('a', 'b'), None)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(profiler.time, 'monotonic', lambda: now[0])
+    return now
+
+
+def test_filter_limits_each_window(clock):
+    rate_filter = RateLimitFilter(limit=2, window=1.0)
+
+    passed = [rate_filter.filter(make_record(logging.DEBUG)) for _ in range(5)]
+    assert passed == [True, True, False, False, False]
+
+    clock[0] += 1.0
+    assert rate_filter.filter(make_record(logging.DEBUG))
+    assert sum(rate_filter.suppressed.values()) == 3
+
+
+def test_filter_keys_by_level(clock):
+    rate_filter = RateLimitFilter(limit=2, window=1.0)
+    for _ in range(10):
+        rate_filter.filter(make_record(logging.DEBUG))
+
+    # Same template at a higher level has its own budget
+    assert rate_filter.filter(make_record(logging.WARNING))
+    assert rate_filter.filter(make_record(logging.WARNING))
+    assert not rate_filter.filter(make_record(logging.WARNING))
+    assert rate_filter.suppressed[('csac.test', 'DEBUG', '%s: %s')] == 8
+    assert rate_filter.suppressed[('csac.test', 'WARNING', '%s: %s')] == 1
+
+
+def test_filter_passes_errors_and_zero_limit(clock):
+    rate_filter = RateLimitFilter(limit=1, window=1.0)
+    assert all(rate_filter.filter(make_record(logging.ERROR)) for _ in range(5))
+
+    rate_filter = RateLimitFilter(limit=0, window=1.0)
+    assert all(rate_filter.filter(make_record(logging.DEBUG)) for _ in range(5))
+
+
+def test_stage_decorator_records_on_exception():
+    perf = PerfRecorder('test')
+
+    @perf.stage('work')
+    def work(fail: bool):
+        if fail:
+            raise ValueError('boom')
+        return 1
+
+    assert work(False) == 1
+    with pytest.raises(ValueError):
+        work(True)
+
+    timer = perf.timers['work']
+    assert timer['calls'] == 2
+    assert timer['total_s'] >= timer['max_s'] >= 0.0
+
+
+def test_report_written_as_json(tmp_path):
+    perf = PerfRecorder('test')
+    with perf.stage('read_csv'):
+        perf.count('files_read')
+    perf.count('files_read', 2)
+
+    path = perf.write_report(str(tmp_path))
+    with open(path, encoding='utf-8') as report_file:
+        report = json.load(report_file)
+
+    assert os.path.basename(path) == 'perf_test.json'
+    assert report['script'] == 'test'
+    assert report['counters'] == {'files_read': 3}
+    assert report['stages']['read_csv']['calls'] == 1
+    assert 'cprofile' not in report and 'samples' not in report
+
+
+def test_sampler_weights_cpu_and_sleep_by_time():
+    def busy(seconds: float):
+        end = time.perf_counter() + seconds
+        while time.perf_counter() < end:
+            sum(range(100))
+
+    def idle(seconds: float):
+        time.sleep(seconds)
+
+    switch_interval = sys.getswitchinterval()
+    sampler = profiler.StackSampler()
+    sampler.start()
+    busy(0.3)
+    idle(0.3)
+    sampler.stop()
+
+    by_function = {'busy': 0.0, 'idle': 0.0}
+    for label, seconds in sampler.leaf_samples.items():
+        for name in by_function:
+            if f':{name}:' in label.split(' > ')[-1]:
+                by_function[name] += seconds
+    assert 0.5 < by_function['busy'] / by_function['idle'] < 2.0
+    assert sys.getswitchinterval() == switch_interval
@@ -0,0 +1,77 @@
+import os
+import sys
+from collections import Counter
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+chess = pytest.importorskip('chess')
+
+import CS_sensor
+import LM_sensor
+from profiler import perf
+
+FEN = '8/8/8/8/8/6B1/5QN1/5K1k w - - 0 1'
+PUZZLES = [
+    # (raw_pgn, initial_fen, mate_in_n, correct_pgn)
+    ('1. Qg1#', FEN, 1, '1. Qg1#'),
+    ('1. Qh2# 1-0', FEN, 1, '1. Qg1#'),
+    ('1... Re1#', FEN, 1, '1. Qg1#'),
+    ('1. Rh3+ Nf3 2. Qxh2#', '7r/8/2KQ4/3B4/8/r4R2/7r/4b1nk w - - 0 1', 2, '1. Rh3+ Nf3 2. Qxh2#'),
+]
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache(monkeypatch):
+    monkeypatch.setattr(CS_sensor, '_BOARD_CACHE', {})
+    monkeypatch.setattr(LM_sensor, '_BOARD_CACHE', {})
+    monkeypatch.setattr(perf, 'counters', Counter())
+
+
+@pytest.mark.parametrize('sensor', [CS_sensor, LM_sensor])
+def test_board_copy_is_independent(sensor):
+    board = sensor.board_from_fen(FEN)
+    board.push_san('Qg1#')
+
+    assert sensor.board_from_fen(FEN).fen() == FEN
+    assert sensor._BOARD_CACHE[FEN].fen() == FEN
+
+
+@pytest.mark.parametrize('sensor', [CS_sensor, LM_sensor])
+def test_board_cache_counters(sensor):
+    for _ in range(3):
+        sensor.board_from_fen(FEN)
+    sensor.board_from_fen(PUZZLES[-1][1])
+
+    assert perf.counters['boards_built'] == 2
+    assert perf.counters['board_cache_hits'] == 2
+
+
+@pytest.mark.parametrize('raw_pgn, initial_fen, mate_in_n, correct_pgn', PUZZLES)
+def test_cs_analysis_same_with_warm_cache(raw_pgn, initial_fen, mate_in_n, correct_pgn):
+    cold = CS_sensor.analyze_constraint_sacrifice(raw_pgn, initial_fen, mate_in_n, correct_pgn)
+    warm = CS_sensor.analyze_constraint_sacrifice(raw_pgn, initial_fen, mate_in_n, correct_pgn)
+
+    assert cold == warm
+    assert perf.counters['board_cache_hits'] == 1
+    assert CS_sensor._BOARD_CACHE[initial_fen].fen() == initial_fen
+
+
+@pytest.mark.parametrize('raw_pgn, initial_fen, mate_in_n, correct_pgn', PUZZLES)
+def test_lm_analysis_same_with_warm_cache(raw_pgn, initial_fen, mate_in_n, correct_pgn):
+    cold = LM_sensor.analyze_constraint_sacrifice(raw_pgn, initial_fen)
+    warm = LM_sensor.analyze_constraint_sacrifice(raw_pgn, initial_fen)
+
+    assert cold == warm
+    assert perf.counters['board_cache_hits'] == 1
+    # The uncopied cached board must not be mutated by the legality check
+    assert LM_sensor._BOARD_CACHE[initial_fen].fen() == initial_fen
+
+
+def test_cs_analysis_results():
+    solved = CS_sensor.analyze_constraint_sacrifice(*PUZZLES[0])
+    illegal = CS_sensor.analyze_constraint_sacrifice(*PUZZLES[2])
+
+    assert solved['is_solved'] == 1 and solved['PMV'] == 0
+    assert illegal['PMV'] == 1